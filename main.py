@@ -1,4 +1,4 @@
-from x11_interactor import X11WindowInteractor
+from x11_interactor import X11WindowInteractor, ActionSequence
 from Xlib import XK
 import time
 import numpy as np
@@ -54,6 +54,26 @@ def main():
     interactor.send_key('1')
     time.sleep(1) # Reduced sleep time
 
+    # --- Example for compiled action sequences ---
+    print("\nPlaying a compiled action sequence...")
+    sequence = (
+        ActionSequence(hold=0.05, gap=0.05)
+        .click(coordinates[0], coordinates[1])
+        .type_text("hello")
+        .key("Return")
+        .wait(0.2)
+    )
+    compiled = sequence.compile()
+    # A compiled sequence can be replayed as often as needed
+    for run in range(2):
+        stats = interactor.play_sequence(compiled)
+        print(
+            f"Run {run + 1}: {stats['events']} events, {stats['flushes']} flushes, "
+            f"planned {stats['planned_duration']:.3f}s, took {stats['actual_duration']:.3f}s, "
+            f"max lateness {stats['max_lateness'] * 1000:.2f} ms"
+        )
+    time.sleep(1)
+
     # --- Example for select_roi_interactive (requires 'slop') ---
     print("\nAttempting ROI selection using 'slop'...")
     roi_slop = interactor.select_roi_interactive()
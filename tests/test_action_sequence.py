@@ -0,0 +1,236 @@
+import Xlib.X
+import Xlib.XK
+import pytest
+from Xlib.xobject.drawable import Window
+
+from x11_interactor import ActionSequence, X11WindowInteractor
+
+
+# Minimal US-style keymap: keycode -> (unshifted keysym, shifted keysym)
+KEYMAP = {
+    10: ("1", "exclam"),
+    36: ("Return", "Return"),
+    37: ("Control_L", "Control_L"),
+    38: ("a", "A"),
+    50: ("Shift_L", "Shift_L"),
+    54: ("c", "C"),
+    65: ("space", "space"),
+}
+
+
+class FakeDisplay:
+    def __init__(self, log):
+        self.log = log
+        self.keysyms = {
+            keycode: tuple(Xlib.XK.string_to_keysym(name) for name in names)
+            for keycode, names in KEYMAP.items()
+        }
+
+    def keysym_to_keycode(self, keysym):
+        for keycode, keysyms in self.keysyms.items():
+            if keysym in keysyms:
+                return keycode
+        return 0
+
+    def keycode_to_keysym(self, keycode, index):
+        return self.keysyms.get(keycode, (0, 0))[index]
+
+    def flush(self):
+        self.log.append("flush")
+
+
+class FakeWindow(Window):
+    def __init__(self, log):
+        super().__init__(None, 0x400001)
+        self.log = log
+
+    def send_event(self, event, propagate=False):
+        self.log.append(event)
+
+
+@pytest.fixture
+def interactor():
+    # Bypass __init__ so no X server, xwininfo or updater thread is needed
+    log = []
+    interactor = X11WindowInteractor.__new__(X11WindowInteractor)
+    interactor.display = FakeDisplay(log)
+    interactor.window = FakeWindow(log)
+    interactor.root = Window(None, 0x100)
+    interactor.window_info = {"x": 100, "y": 200, "width": 640, "height": 480}
+    interactor.log = log
+    return interactor
+
+
+def sent_events(interactor):
+    return [entry for entry in interactor.log if entry != "flush"]
+
+
+def test_compile_offsets_and_order():
+    compiled = (
+        ActionSequence(hold=0.05, gap=0.1)
+        .click(10, 20, button=3)
+        .key(["Control_L", "c"], hold=0.02)
+        .type_text("a\r")
+        .wait(0.5)
+        .compile()
+    )
+
+    ctrl = Xlib.X.ControlMask
+    expected = [
+        (0.0, "motion", 0, 10, 20, 0),
+        (0.0, "button_press", 3, 10, 20, 0),
+        (0.05, "button_release", 3, 10, 20, 0),
+        # Modifiers go down first and come up last, and set the state of
+        # the events they are held for
+        (0.15, "key_press", "Control_L", 0, 0, 0),
+        (0.15, "key_press", "c", 0, 0, ctrl),
+        (0.17, "key_release", "c", 0, 0, ctrl),
+        (0.17, "key_release", "Control_L", 0, 0, ctrl),
+        (0.27, "key_press", "a", 0, 0, 0),
+        (0.32, "key_release", "a", 0, 0, 0),
+        # Carriage return maps to the Return keysym
+        (0.42, "key_press", "Return", 0, 0, 0),
+        (0.47, "key_release", "Return", 0, 0, 0),
+    ]
+    assert len(compiled) == len(expected)
+    for actual, wanted in zip(compiled, expected):
+        assert actual[0] == pytest.approx(wanted[0])
+        assert actual[1:] == wanted[1:]
+
+    # Trailing gap and wait count toward the total duration
+    assert compiled.duration == pytest.approx(0.47 + 0.1 + 0.5)
+
+
+def test_type_text_maps_whitespace():
+    compiled = ActionSequence().type_text(" \n\t").compile()
+    presses = [event[2] for event in compiled if event[1] == "key_press"]
+    assert presses == ["space", "Return", "Tab"]
+
+
+def test_compiled_sequence_is_read_only():
+    compiled = ActionSequence().click(1, 1).compile()
+    with pytest.raises(AttributeError):
+        compiled.events = ()
+    with pytest.raises(AttributeError):
+        compiled.duration = 0.0
+    with pytest.raises(AttributeError):
+        compiled.extra = 1
+
+
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda: ActionSequence(hold=-0.01),
+        lambda: ActionSequence(gap=-0.1),
+        lambda: ActionSequence().wait(-1),
+        lambda: ActionSequence().click(0, 0, hold=-0.01),
+        lambda: ActionSequence().key("a", hold=-0.01),
+        lambda: ActionSequence(gap=float("nan")),
+        lambda: ActionSequence(hold=float("inf")),
+        lambda: ActionSequence().wait(float("nan")),
+        lambda: ActionSequence().click(0, 0, hold=float("inf")),
+    ],
+)
+def test_invalid_durations_rejected(build):
+    with pytest.raises(ValueError):
+        build()
+
+
+def test_play_sequence_flushes_once_per_offset(interactor):
+    compiled = (
+        ActionSequence(hold=0.001, gap=0.001)
+        .click(5, 6)
+        .key(["Control_L", "c"])
+        .type_text("a1!")
+        .compile()
+    )
+    stats = interactor.play_sequence(compiled, spin_threshold=0.0)
+
+    offsets = [event[0] for event in compiled]
+    assert stats["events"] == len(compiled) == 13
+    assert stats["flushes"] == len(set(offsets)) == 10
+    assert interactor.log.count("flush") == stats["flushes"]
+    assert interactor.log[-1] == "flush"
+
+
+def test_play_sequence_stats(interactor):
+    compiled = ActionSequence(hold=0.001, gap=0.001).click(1, 1).wait(0.02).compile()
+    stats = interactor.play_sequence(compiled, spin_threshold=0.0)
+
+    assert set(stats) == {
+        "events",
+        "flushes",
+        "planned_duration",
+        "actual_duration",
+        "mean_lateness",
+        "max_lateness",
+    }
+    assert stats["planned_duration"] == pytest.approx(compiled.duration)
+    # Playback lasts through the trailing wait, not just the last event
+    assert stats["actual_duration"] >= compiled.duration
+    assert 0.0 <= stats["mean_lateness"] <= stats["max_lateness"]
+
+
+def test_play_sequence_offsets_root_coordinates(interactor):
+    compiled = ActionSequence(hold=0.0, gap=0.0).click(10, 20, button=3).compile()
+    interactor.play_sequence(compiled)
+
+    motion, press, release = sent_events(interactor)
+    for event in (motion, press, release):
+        assert (event.root_x, event.root_y) == (110, 220)
+        assert (event.event_x, event.event_y) == (10, 20)
+    assert press.detail == release.detail == 3
+
+
+def test_play_sequence_sets_shift_for_shifted_characters(interactor):
+    compiled = ActionSequence(hold=0.0, gap=0.0).type_text("aA!").compile()
+    interactor.play_sequence(compiled)
+
+    events = sent_events(interactor)
+    assert [event.detail for event in events] == [38, 38, 38, 38, 10, 10]
+    assert [event.state for event in events] == [
+        0,
+        0,
+        Xlib.X.ShiftMask,
+        Xlib.X.ShiftMask,
+        Xlib.X.ShiftMask,
+        Xlib.X.ShiftMask,
+    ]
+
+
+def test_play_sequence_applies_explicit_modifiers(interactor):
+    compiled = (
+        ActionSequence(hold=0.0, gap=0.0)
+        .key(["Control_L", "c"])
+        .key(["Shift_L", "a"])
+        .compile()
+    )
+    interactor.play_sequence(compiled)
+
+    events = sent_events(interactor)
+    assert [(event.detail, event.state) for event in events] == [
+        (37, 0),
+        (54, Xlib.X.ControlMask),
+        (54, Xlib.X.ControlMask),
+        (37, Xlib.X.ControlMask),
+        (50, 0),
+        (38, Xlib.X.ShiftMask),
+        (38, Xlib.X.ShiftMask),
+        (50, Xlib.X.ShiftMask),
+    ]
+
+
+@pytest.mark.parametrize("spin_threshold", [-0.001, float("nan"), float("inf")])
+def test_play_sequence_rejects_invalid_spin_threshold(interactor, spin_threshold):
+    compiled = ActionSequence().click(1, 1).compile()
+    with pytest.raises(ValueError, match="spin_threshold"):
+        interactor.play_sequence(compiled, spin_threshold=spin_threshold)
+    assert interactor.log == []
+
+
+@pytest.mark.parametrize("keys", ["€", "Retrun", "\x07"])
+def test_play_sequence_rejects_unmapped_keys_before_sending(interactor, keys):
+    compiled = ActionSequence(hold=0.0, gap=0.0).click(1, 1).key(keys).compile()
+    with pytest.raises(ValueError, match="No keycode"):
+        interactor.play_sequence(compiled)
+    assert interactor.log == []
@@ -3,6 +3,7 @@ import Xlib.XK
 import Xlib.display
 import Xlib.X
 import Xlib.protocol.event
+import math
 import subprocess
 import numpy as np
 import time
@@ -27,6 +28,217 @@ except ImportError:
     print("Warning: sapiagent library not available. Mouse control will not work.")
 
 
+class ActionSequence:
+    """
+    Builder for a macro of mouse moves, clicks, keypresses and waits.
+
+    Actions are recorded against window-relative coordinates and keysym names,
+    so a sequence is not tied to any particular window or display. Call
+    compile() to turn it into a flat, time-ordered list of low-level events
+    which X11WindowInteractor.play_sequence() can replay any number of times.
+
+    Example:
+        seq = (
+            ActionSequence()
+            .click(50, 100)
+            .type_text("hello")
+            .key("Return")
+            .wait(0.2)
+            .click(200, 40, button=3)
+        )
+        compiled = seq.compile()
+        stats = interactor.play_sequence(compiled)
+    """
+
+    def __init__(self, hold=0.05, gap=0.05):
+        """
+        Parameters:
+            hold (float): Default seconds a button or key is held down.
+            gap (float): Default seconds between consecutive actions.
+        """
+        self.hold = _check_duration("hold", hold)
+        self.gap = _check_duration("gap", gap)
+        self._actions = []
+
+    def move(self, relative_x, relative_y):
+        """Move the pointer to coordinates relative to the window."""
+        self._actions.append(("move", (relative_x, relative_y)))
+        return self
+
+    def click(self, relative_x, relative_y, button=1, hold=None):
+        """Move to the given relative coordinates and click a mouse button."""
+        if hold is not None:
+            _check_duration("hold", hold)
+        self._actions.append(("click", (relative_x, relative_y, button, hold)))
+        return self
+
+    def key(self, keys, hold=None):
+        """Press a key or key combination, same format as send_key()."""
+        if isinstance(keys, str):
+            keys = [keys]
+        if hold is not None:
+            _check_duration("hold", hold)
+        self._actions.append(("key", (tuple(keys), hold)))
+        return self
+
+    def type_text(self, text, hold=None):
+        """Type each character of text as a separate keypress."""
+        for char in text:
+            self.key(_char_to_keysym_name(char), hold=hold)
+        return self
+
+    def wait(self, seconds):
+        """Pause for the given number of seconds before the next action."""
+        self._actions.append(("wait", (_check_duration("seconds", seconds),)))
+        return self
+
+    def compile(self):
+        """
+        Flatten the recorded actions into a time-ordered event list.
+
+        Returns:
+            CompiledSequence: The events plus the total duration of the sequence,
+            including any trailing wait or gap.
+        """
+        events = []
+        t = 0.0
+        for action, args in self._actions:
+            if action == "wait":
+                t += args[0]
+                continue
+
+            if action == "move":
+                x, y = args
+                events.append((t, "motion", 0, x, y, 0))
+            elif action == "click":
+                x, y, button, hold = args
+                hold = self.hold if hold is None else hold
+                events.append((t, "motion", 0, x, y, 0))
+                events.append((t, "button_press", button, x, y, 0))
+                t += hold
+                events.append((t, "button_release", button, x, y, 0))
+            elif action == "key":
+                keys, hold = args
+                hold = self.hold if hold is None else hold
+                # Modifiers go down first and come up last, like send_key().
+                # Synthetic events don't update the server's modifier state, so
+                # each event carries the masks of the modifiers held before it.
+                state = 0
+                for name in keys:
+                    events.append((t, "key_press", name, 0, 0, state))
+                    state |= _MODIFIER_MASKS.get(name, 0)
+                t += hold
+                for name in reversed(keys):
+                    events.append((t, "key_release", name, 0, 0, state))
+                    state &= ~_MODIFIER_MASKS.get(name, 0)
+            t += self.gap
+
+        return CompiledSequence(events, t)
+
+
+class CompiledSequence:
+    """
+    Immutable result of ActionSequence.compile().
+
+    Attributes:
+        events (tuple): Events of the form (offset, kind, detail, x, y, state),
+            where offset is seconds from the start of playback, kind is one of
+            "motion", "button_press", "button_release", "key_press" or
+            "key_release", detail is the button number or keysym name, x/y
+            are relative coordinates (0 for key events), and state is the X
+            modifier mask of the keys held down in the same key combination.
+        duration (float): Seconds from the start of playback to the end of the
+            sequence. This can be later than the last event's offset, because
+            trailing waits and gaps count too.
+    """
+
+    __slots__ = ("_events", "_duration")
+
+    def __init__(self, events, duration):
+        self._events = tuple(events)
+        self._duration = duration
+
+    @property
+    def events(self):
+        return self._events
+
+    @property
+    def duration(self):
+        return self._duration
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+
+# Modifier mask each modifier keysym contributes to the state of later events
+_MODIFIER_MASKS = {
+    "Shift_L": Xlib.X.ShiftMask,
+    "Shift_R": Xlib.X.ShiftMask,
+    "Control_L": Xlib.X.ControlMask,
+    "Control_R": Xlib.X.ControlMask,
+    "Alt_L": Xlib.X.Mod1Mask,
+    "Alt_R": Xlib.X.Mod1Mask,
+    "Meta_L": Xlib.X.Mod1Mask,
+    "Meta_R": Xlib.X.Mod1Mask,
+    "Super_L": Xlib.X.Mod4Mask,
+    "Super_R": Xlib.X.Mod4Mask,
+    "ISO_Level3_Shift": Xlib.X.Mod5Mask,
+}
+
+
+def _check_duration(name, value):
+    # Negative or non-finite durations would break the playback schedule
+    if not (math.isfinite(value) and value >= 0):
+        raise ValueError(f"{name} must be a finite non-negative number, got {value!r}")
+    return value
+
+
+def _char_to_keysym_name(char):
+    # Whitespace has no single-character keysym name; other control
+    # characters are left as-is and rejected by play_sequence()
+    special = {
+        " ": "space",
+        "\n": "Return",
+        "\r": "Return",
+        "\t": "Tab",
+    }
+    return special.get(char, char)
+
+
+def _string_to_keysym(name):
+    # Resolve a keysym name, falling back to the character itself for
+    # punctuation and other symbols that are not named like letters are
+    keysym = Xlib.XK.string_to_keysym(name)
+    if keysym == Xlib.X.NoSymbol and len(name) == 1:
+        codepoint = ord(name)
+        # Printable Latin-1 keysyms equal their code point
+        if 0x20 <= codepoint <= 0x7E or 0xA0 <= codepoint <= 0xFF:
+            keysym = codepoint
+    return keysym
+
+
+# Maps compiled event kinds to the X event classes play_sequence() sends
+_SEQUENCE_EVENT_CLASSES = {
+    "motion": Xlib.protocol.event.MotionNotify,
+    "button_press": Xlib.protocol.event.ButtonPress,
+    "button_release": Xlib.protocol.event.ButtonRelease,
+    "key_press": Xlib.protocol.event.KeyPress,
+    "key_release": Xlib.protocol.event.KeyRelease,
+}
+
+
+def _wait_until(deadline, spin_threshold):
+    # Sleep until shortly before a perf_counter() deadline, then busy-wait
+    remaining = deadline - time.perf_counter()
+    if remaining > spin_threshold:
+        time.sleep(remaining - spin_threshold)
+    while time.perf_counter() < deadline:
+        pass
+
+
 class X11WindowInteractor:
     def __init__(self, window_id=None, update_interval=1.0, model_path=None):
         # Initialize MSS for screen capture
@@ -321,6 +533,103 @@ class X11WindowInteractor:
 
         self.display.sync()
 
+    def play_sequence(self, compiled, spin_threshold=0.002):
+        """
+        Replay a compiled ActionSequence against this window.
+
+        All X events are built up front, then emitted on a perf_counter()
+        schedule. Events sharing an offset are written together and the
+        connection is only flushed before waiting for the next offset, so
+        there are no per-step round trips to the server.
+
+        Playback lasts until the sequence's full duration, so back-to-back
+        calls keep the spacing given by a trailing wait() or gap.
+
+        Parameters:
+            compiled (CompiledSequence): Output of ActionSequence.compile().
+            spin_threshold (float): Seconds before each deadline at which to
+                stop sleeping and busy-wait, trading CPU for timing accuracy.
+
+        Raises:
+            ValueError: If spin_threshold is negative or not finite, or if a key
+                name cannot be mapped to a keycode in the current keyboard
+                layout. Both are checked before any event is sent.
+
+        Returns:
+            dict: Timing statistics with keys "events", "flushes",
+            "planned_duration", "actual_duration", "mean_lateness" and
+            "max_lateness" (all durations in seconds).
+        """
+        _check_duration("spin_threshold", spin_threshold)
+
+        # Resolve window position once so every event uses the same geometry
+        origin_x = self.window_info["x"]
+        origin_y = self.window_info["y"]
+        keycodes = {}
+        schedule = []
+
+        for offset, kind, detail, x, y, state in compiled.events:
+            if kind in ("key_press", "key_release"):
+                if detail not in keycodes:
+                    keysym = _string_to_keysym(detail)
+                    keycode = self.display.keysym_to_keycode(keysym)
+                    if keysym == Xlib.X.NoSymbol or keycode == 0:
+                        raise ValueError(f"No keycode for {detail!r}")
+                    # Shifted symbols share a keycode with their unshifted form
+                    shifted = (
+                        self.display.keycode_to_keysym(keycode, 0) != keysym
+                        and self.display.keycode_to_keysym(keycode, 1) == keysym
+                    )
+                    keycodes[detail] = (keycode, Xlib.X.ShiftMask if shifted else 0)
+                detail, implied_state = keycodes[detail]
+                state |= implied_state
+
+            event_class = _SEQUENCE_EVENT_CLASSES[kind]
+            fields = dict(
+                time=Xlib.X.CurrentTime,
+                root=self.root,
+                window=self.window,
+                same_screen=1,
+                child=Xlib.X.NONE,
+                root_x=origin_x + x,
+                root_y=origin_y + y,
+                event_x=x,
+                event_y=y,
+                state=state,
+                detail=detail,
+            )
+            if kind == "motion":
+                fields["is_hint"] = 0
+            schedule.append((offset, event_class(**fields)))
+
+        lateness = []
+        flushes = 0
+        start = time.perf_counter()
+        for i, (offset, event) in enumerate(schedule):
+            deadline = start + offset
+            _wait_until(deadline, spin_threshold)
+
+            lateness.append(time.perf_counter() - deadline)
+            self.window.send_event(event, propagate=True)
+
+            # Only flush when the next event is not due at the same instant
+            if i + 1 == len(schedule) or schedule[i + 1][0] > offset:
+                self.display.flush()
+                flushes += 1
+
+        # Hold the remaining time so trailing waits and gaps are honoured
+        _wait_until(start + compiled.duration, spin_threshold)
+        actual_duration = time.perf_counter() - start
+
+        return {
+            "events": len(schedule),
+            "flushes": flushes,
+            "planned_duration": compiled.duration,
+            "actual_duration": actual_duration,
+            "mean_lateness": sum(lateness) / len(lateness) if lateness else 0.0,
+            "max_lateness": max(lateness, default=0.0),
+        }
+
     def capture(self, xywh: tuple = None) -> np.ndarray:
         # Capture a screenshot of the window or a subregion of it
         if xywh: